@@ -5,46 +5,192 @@ from base64 import b64decode
 from pypdf import PdfReader, PdfWriter
 from reportlab.pdfgen import canvas as rlcanvas
 from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from PIL import Image, ImageDraw, ImageFont
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
 import json
 import datetime
-import os, uuid, tempfile, time
+import gzip, hashlib, math, threading, tracemalloc
+import os, re, uuid, tempfile, time
 
 app = Flask(__name__)
 
 # === Direktori hasil sementara (buat preview stabil) ===
-RESULT_DIR = os.path.join(tempfile.gettempdir(), "pdf_tools_results")
-os.makedirs(RESULT_DIR, exist_ok=True)
+RESULT_DIR = os.environ.get("CIBEN_RESULT_DIR") or os.path.join(tempfile.gettempdir(), "pdf_tools_results")
+RESULT_CLEANUP_INTERVAL = 600  # detik; cleanup tidak perlu jalan di setiap save
+_TOKEN_RE = re.compile(r"[0-9a-f]{32}")
 
-def cleanup_old_results(max_age_hours=12):
-    cutoff = time.time() - max_age_hours * 3600
-    try:
-        for name in os.listdir(RESULT_DIR):
-            if not name.endswith(".pdf"):
-                continue
-            path = os.path.join(RESULT_DIR, name)
+# === Cache indeks posisi teks (untuk placement berbasis anchor) ===
+INDEX_DIR = os.path.join(tempfile.gettempdir(), "pdf_tools_textindex")
+os.makedirs(INDEX_DIR, exist_ok=True)
+TEXT_INDEX_MEM_MAX = 64
+
+# ---------- Result storage ----------
+class ResultStorage(ABC):
+    # antarmuka backend penyimpanan hasil; token = uuid4 hex
+    @abstractmethod
+    def save(self, token: str, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def open(self, token: str):
+        # path file atau file-like (untuk send_file), None kalau tidak ada
+        ...
+
+    def cleanup(self, max_age_hours=12) -> None:
+        pass
+
+class LocalShardedStorage(ResultStorage):
+    # <root>/<2 char pertama token>/<token>.pdf — root bisa direktori lokal
+    # atau shared volume (NFS/EFS) yang di-mount semua node
+    def __init__(self, root: str, shard_chars: int = 2):
+        self.root = root
+        self.shard_chars = shard_chars
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, token: str) -> str:
+        return os.path.join(self.root, token[:self.shard_chars], f"{token}.pdf")
+
+    def save(self, token, data):
+        path = self.path_for(token)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)  # atomik: node lain tidak pernah melihat file setengah jadi
+
+    def open(self, token):
+        path = self.path_for(token)
+        if os.path.exists(path):
+            return path
+        legacy = os.path.join(self.root, f"{token}.pdf")  # token dari layout lama (flat)
+        return legacy if os.path.exists(legacy) else None
+
+    def cleanup(self, max_age_hours=12):
+        cutoff = time.time() - max_age_hours * 3600
+        try:
+            entries = list(os.scandir(self.root))
+        except Exception:
+            return
+        for entry in entries:
             try:
-                if os.path.getmtime(path) < cutoff:
-                    os.remove(path)
+                if entry.is_dir():
+                    for f in os.scandir(entry.path):
+                        if f.name.endswith((".pdf", ".tmp")) and f.stat().st_mtime < cutoff:
+                            os.remove(f.path)
+                elif entry.name.endswith(".pdf") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)  # sisa layout lama (flat)
             except Exception:
                 pass
+
+class S3Storage(ResultStorage):
+    # S3 / S3-compatible (MinIO, moto server, dsb. via endpoint_url)
+    # pembersihan sebaiknya lewat lifecycle rule bucket
+    def __init__(self, bucket: str, prefix: str = "results/", client=None, endpoint_url: str | None = None):
+        if client is None:
+            try:
+                import boto3
+            except ImportError as e:
+                raise RuntimeError("S3Storage butuh boto3: pip install boto3") from e
+            client = boto3.client("s3", endpoint_url=endpoint_url or None)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def key_for(self, token: str) -> str:
+        return f"{self.prefix}{token[:2]}/{token}.pdf"
+
+    def save(self, token, data):
+        self.client.put_object(Bucket=self.bucket, Key=self.key_for(token), Body=data, ContentType="application/pdf")
+
+    def open(self, token):
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self.key_for(token))
+        except Exception as e:
+            # hanya "key tidak ada" yang jadi 404; kredensial/jaringan/throttling diteruskan
+            err = getattr(e, "response", None) or {}
+            code = str(err.get("Error", {}).get("Code", ""))
+            if code in ("NoSuchKey", "404", "NotFound"):
+                return None
+            raise
+        return BytesIO(obj["Body"].read())
+
+def make_result_storage() -> ResultStorage:
+    # CIBEN_STORAGE=local (default) | s3
+    kind = os.environ.get("CIBEN_STORAGE", "local").lower()
+    if kind == "s3":
+        bucket = os.environ.get("CIBEN_S3_BUCKET")
+        if not bucket:
+            raise RuntimeError("CIBEN_STORAGE=s3 butuh CIBEN_S3_BUCKET")
+        return S3Storage(
+            bucket=bucket,
+            prefix=os.environ.get("CIBEN_S3_PREFIX", "results/"),
+            endpoint_url=os.environ.get("CIBEN_S3_ENDPOINT"),
+        )
+    return LocalShardedStorage(RESULT_DIR)
+
+_result_storage = None
+_result_storage_lock = threading.Lock()
+_last_cleanup = 0.0
+_last_index_cleanup = 0.0
+
+def get_result_storage() -> ResultStorage:
+    # dibuat saat pertama dipakai, supaya import modul / CLI split-rotate
+    # tidak butuh konfigurasi S3 maupun boto3
+    global _result_storage
+    if _result_storage is None:
+        with _result_storage_lock:
+            if _result_storage is None:
+                _result_storage = make_result_storage()
+    return _result_storage
+
+def cleanup_old_results(max_age_hours=12):
+    get_result_storage().cleanup(max_age_hours)
+
+def cleanup_text_index(max_age_hours=24 * 7):
+    # INDEX_DIR/<2 char hash>/<hash>.vN.json.gz; file flat sisa format lama ikut dibersihkan
+    cutoff = time.time() - max_age_hours * 3600
+    try:
+        entries = list(os.scandir(INDEX_DIR))
     except Exception:
-        pass
+        return
+    for entry in entries:
+        try:
+            if entry.is_dir():
+                for f in os.scandir(entry.path):
+                    if f.stat().st_mtime < cutoff:
+                        os.remove(f.path)
+            elif entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except Exception:
+            pass
+
+def maybe_cleanup_text_index():
+    # dipanggil di setiap cache miss; scan direktori paling sering sekali per interval
+    global _last_index_cleanup
+    now = time.time()
+    if now - _last_index_cleanup > RESULT_CLEANUP_INTERVAL:
+        _last_index_cleanup = now
+        cleanup_text_index()
 
 def save_result_pdf(pdf_bytes: bytes, suggest_name: str = "output.pdf"):
-    cleanup_old_results()
+    global _last_cleanup
+    now = time.time()
+    if now - _last_cleanup > RESULT_CLEANUP_INTERVAL:
+        _last_cleanup = now
+        cleanup_old_results()
     token = uuid.uuid4().hex
-    path = os.path.join(RESULT_DIR, f"{token}.pdf")
-    with open(path, "wb") as f:
-        f.write(pdf_bytes)
+    get_result_storage().save(token, pdf_bytes)
     size_kb = round(len(pdf_bytes) / 1024, 1)
     return f"/result/{token}.pdf", suggest_name, size_kb
 
 @app.route("/result/<token>.pdf")
 def serve_result_pdf(token):
-    path = os.path.join(RESULT_DIR, f"{token}.pdf")
-    if os.path.exists(path):
-        return send_file(path, mimetype="application/pdf", as_attachment=False, download_name="result.pdf")
+    src = get_result_storage().open(token) if _TOKEN_RE.fullmatch(token) else None
+    if src is not None:
+        return send_file(src, mimetype="application/pdf", as_attachment=False, download_name="result.pdf")
     return "Not found", 404
 
 HTML = r"""
@@ -141,6 +287,8 @@ HTML = r"""
           <input type="hidden" name="action" value="merge">
           <label class="label block mb-1">Pilih beberapa PDF</label>
           <input class="inpt" type="file" name="files" accept="application/pdf" multiple required>
+          <label class="label block mt-4">Urutan &amp; halaman (opsional): contoh <code>a.pdf[1-3] + b.pdf[all]</code></label>
+          <input class="inpt" type="text" name="merge_spec" placeholder="kosongkan = semua halaman, urutan unggah">
           <div class="mt-4 flex gap-2">
             <button class="btn">Gabungkan</button>
             <button class="btn btn-sec" type="reset">Reset</button>
@@ -204,7 +352,7 @@ HTML = r"""
               </div>
               <div>
                 <label class="label block mb-1">Lebar tanda tangan (%)</label>
-                <input class="inpt" type="number" min="10" max="60" x-model.number="widthPct">
+                <input class="inpt" type="number" name="width_pct" min="10" max="60" x-model.number="widthPct">
               </div>
               <div class="col-span-2">
                 <label class="inline-flex items-center gap-2 text-xs px-3 py-2 rounded-lg border" style="border-color:var(--border);">
@@ -270,13 +418,37 @@ HTML = r"""
             </div>
           </div>
 
+          <!-- Placement otomatis berbasis teks (anchor) -->
+          <div class="grid md:grid-cols-3 gap-4 mt-2">
+            <div>
+              <label class="label block mb-1">Anchor teks (opsional)</label>
+              <input class="inpt" type="text" name="anchor_text" x-model="anchorText" placeholder="Tanda tangan:">
+            </div>
+            <div>
+              <label class="label block mb-1">Jarak kanan anchor (cm)</label>
+              <input class="inpt" type="number" step="0.1" name="anchor_dx_cm" value="2">
+            </div>
+            <div>
+              <label class="label block mb-1">Halaman anchor</label>
+              <input class="inpt" type="text" name="anchor_pages" value="all" placeholder="all / 1,3-4">
+            </div>
+            <div class="muted md:col-span-3">Tanda tangan ditempel di kanan setiap kemunculan teks ini (tanpa perlu Apply per halaman).</div>
+          </div>
+
           <div class="mt-5 flex gap-2">
-            <button class="btn" type="submit" :disabled="!pdfDoc || placements.length===0">Tandatangani</button>
+            <button class="btn" type="submit" :disabled="!pdfDoc || (placements.length===0 && !anchorText.trim())">Tandatangani</button>
             <button class="btn btn-sec" type="reset" @click="resetSign()">Reset</button>
           </div>
         </form>
       </div>
 
+      {% if error %}
+      <div class="card p-5" style="border-color:#dc2626">
+        <div class="font-semibold">Gagal diproses</div>
+        <div class="muted">{{ error }}</div>
+      </div>
+      {% endif %}
+
       {% if result_url %}
       <div class="card p-5">
         <div class="flex items-center justify-between flex-wrap gap-3">
@@ -308,13 +480,17 @@ HTML = r"""
 
   <script>
     function ui(){
+      // cache render di luar state Alpine agar bitmap tidak dibungkus proxy reaktif
+      const pageCache = new Map(), pageInflight = new Map();
       return {
         dark:(() => { const s=localStorage.getItem('theme'); if(s==='dark') return true; if(s==='light') return false; return window.matchMedia('(prefers-color-scheme: dark)').matches; })(),
         tab:'{{ active_tab or "sign" }}',
 
         pdfDoc:null, pageNum:1, pageCount:null, scale:1, fileArrayBuffer:null,
+        cssW:0, cssH:0, // ukuran tampilan canvas (CSS px); canvas.width bisa lebih besar karena DPR
+        pageCacheMax:12,
         mode:'draw', typedText:'', thin:false,
-        widthPct:35, placements:[],
+        widthPct:35, placements:[], anchorText:'',
         dragging:false, dragOffsetX:0, dragOffsetY:0,
         sigAR:4.0, // aspect ratio agar ghost selalu punya tinggi
 
@@ -330,6 +506,7 @@ HTML = r"""
           const file = ev.target.files?.[0];
           if(!file) return;
           this.fileArrayBuffer = await file.arrayBuffer();
+          this.clearPageCache();
           try{
             this.pdfDoc = await pdfjsLib.getDocument({data: this.fileArrayBuffer}).promise;
             this.pageCount = this.pdfDoc.numPages;
@@ -339,23 +516,86 @@ HTML = r"""
             alert('Gagal memuat PDF: ' + err);
           }
         },
-        async renderPage(){
-          if(!this.pdfDoc) return;
-          const page = await this.pdfDoc.getPage(this.pageNum);
-          const stage = this.$refs.stage;
-          const targetWidth = Math.max(320, stage.clientWidth || 800);
+        // ===== Render cache (LRU bitmap per halaman) + prefetch =====
+        renderDPR(){ return Math.min(2, Math.max(1, window.devicePixelRatio||1)); },
+        stageWidth(){ return Math.max(320, this.$refs.stage?.clientWidth || 800); },
+        clearPageCache(){
+          for(const e of pageCache.values()) e.img.close?.();
+          pageCache.clear(); pageInflight.clear();
+        },
+        cachePut(key, entry){
+          pageCache.delete(key);
+          pageCache.set(key, entry);
+          while(pageCache.size > this.pageCacheMax){
+            const oldest = pageCache.keys().next().value;
+            pageCache.get(oldest).img.close?.();
+            pageCache.delete(oldest);
+          }
+        },
+        async rasterize(num, targetWidth){
+          const doc = this.pdfDoc;
+          const page = await doc.getPage(num);
           const vp1 = page.getViewport({ scale: 1 });
           const scale = targetWidth / vp1.width;
-          this.scale = scale;
-          const viewport = page.getViewport({ scale });
+          const viewport = page.getViewport({ scale: scale * this.renderDPR() });
+          const w = Math.floor(viewport.width), h = Math.floor(viewport.height);
+          // OffscreenCanvas (kalau ada) -> tidak menyentuh DOM/layout; fallback canvas biasa
+          const draw = async (offscreen)=>{
+            let cv;
+            if(offscreen){ cv = new OffscreenCanvas(w, h); }
+            else { cv = document.createElement('canvas'); cv.width = w; cv.height = h; }
+            await page.render({ canvasContext: cv.getContext('2d', {alpha:false}), viewport }).promise;
+            return cv;
+          };
+          let cv;
+          try{ cv = await draw(!!window.OffscreenCanvas); }
+          catch(e){ if(!window.OffscreenCanvas) throw e; cv = await draw(false); }
+          page.cleanup?.();
+          let img = cv;
+          if(window.createImageBitmap){
+            try{ img = await createImageBitmap(cv); cv.width = cv.height = 0; }catch(e){ img = cv; }
+          }
+          return { img, scale, cssW: Math.floor(vp1.width*scale), cssH: Math.floor(vp1.height*scale), doc };
+        },
+        getRendered(num){
+          const targetWidth = this.stageWidth();
+          const key = num + '@' + targetWidth + 'x' + this.renderDPR();
+          const hit = pageCache.get(key);
+          if(hit){ this.cachePut(key, hit); return Promise.resolve(hit); }
+          if(pageInflight.has(key)) return pageInflight.get(key);
+          const job = this.rasterize(num, targetWidth).then(entry=>{
+            pageInflight.delete(key);
+            if(entry.doc === this.pdfDoc) this.cachePut(key, entry); // abaikan hasil PDF lama
+            return entry;
+          }, err=>{ pageInflight.delete(key); throw err; });
+          pageInflight.set(key, job);
+          return job;
+        },
+        prefetchNeighbors(){
+          const idle = window.requestIdleCallback || (cb=>setTimeout(cb, 120));
+          const doc = this.pdfDoc, cur = this.pageNum;
+          for(const n of [cur+1, cur-1]){
+            if(n < 1 || n > (this.pageCount||0)) continue;
+            idle(()=>{ if(this.pdfDoc===doc) this.getRendered(n).catch(()=>{}); });
+          }
+        },
+        async renderPage(){
+          if(!this.pdfDoc) return;
+          const num = this.pageNum;
+          const entry = await this.getRendered(num);
+          if(num !== this.pageNum || entry.doc !== this.pdfDoc) return; // user sudah pindah halaman
+          this.scale = entry.scale;
 
           const canvas = this.$refs.pdfcanvas;
           const ctx = canvas.getContext('2d', {alpha:false});
-          canvas.width  = Math.floor(viewport.width);
-          canvas.height = Math.floor(viewport.height);
-          await page.render({ canvasContext: ctx, viewport }).promise;
+          canvas.width  = entry.img.width;
+          canvas.height = entry.img.height;
+          ctx.drawImage(entry.img, 0, 0);
+          this.cssW = entry.cssW;
+          this.cssH = entry.cssH;
 
           this.layoutGhost();
+          this.prefetchNeighbors();
         },
 
         prevPage(){ if(this.pdfDoc && this.pageNum>1){ this.pageNum--; this.renderPage(); } },
@@ -364,9 +604,8 @@ HTML = r"""
         // ===== Signature ghost =====
         get ghostStyle(){
           const st = {};
-          const canvas = this.$refs.pdfcanvas;
-          const cw = canvas?.width || 800;
-          const ch = canvas?.height || 600;
+          const cw = this.cssW || 800;
+          const ch = this.cssH || 600;
           const gw = Math.max(10, Math.floor(cw * (this.widthPct/100)));
           const gh = Math.max(24, Math.round(gw / (this.sigAR||4.0)));
           st.width  = gw + 'px';
@@ -391,15 +630,15 @@ HTML = r"""
           return st;
         },
         layoutGhost(){
-          const g=this.$refs.ghost, c=this.$refs.pdfcanvas;
-          if(!g||!c) return;
+          const g=this.$refs.ghost;
+          if(!g||!this.cssW) return;
           const p = this.placements.find(x=>x.page===this.pageNum);
           if(!p){
-            const margin = Math.floor(c.width*0.03);
-            const gw = Math.max(10, Math.floor(c.width*(this.widthPct/100)));
+            const margin = Math.floor(this.cssW*0.03);
+            const gw = Math.max(10, Math.floor(this.cssW*(this.widthPct/100)));
             const gh = Math.max(24, Math.round(gw/(this.sigAR||4.0)));
-            g.style.left = (c.width - gw - margin) + 'px';
-            g.style.top  = (c.height - gh - margin) + 'px';
+            g.style.left = (this.cssW - gw - margin) + 'px';
+            g.style.top  = (this.cssH - gh - margin) + 'px';
           }
         },
         startDrag(e){
@@ -419,13 +658,13 @@ HTML = r"""
           if(!this.dragging) return;
           e.preventDefault?.();
           const stageRect = this.$refs.stage.getBoundingClientRect();
-          const g=this.$refs.ghost, c=this.$refs.pdfcanvas;
+          const g=this.$refs.ghost;
           const clientX = e.touches?e.touches[0].clientX:e.clientX;
           const clientY = e.touches?e.touches[0].clientY:e.clientY;
           let x = clientX - stageRect.left - this.dragOffsetX;
           let y = clientY - stageRect.top  - this.dragOffsetY;
-          const maxX = (c.width  - g.offsetWidth);
-          const maxY = (c.height - g.offsetHeight);
+          const maxX = (this.cssW - g.offsetWidth);
+          const maxY = (this.cssH - g.offsetHeight);
           x = Math.max(0, Math.min(x, maxX));
           y = Math.max(0, Math.min(y, maxY));
           g.style.left = x + 'px';
@@ -507,10 +746,10 @@ HTML = r"""
         applyPlacement(){
           const canvas = this.$refs.pdfcanvas, ghost=this.$refs.ghost;
           if(!canvas || !ghost) return;
-          const cw = canvas.width, ch = canvas.height;
+          const cw = this.cssW || canvas.clientWidth, ch = this.cssH || canvas.clientHeight;
           const left = parseFloat(ghost.style.left||'0');
           const top  = parseFloat(ghost.style.top||'0');
-          const gh   = ghost.offsetHeight || Math.round((canvas.width*(this.widthPct/100))/(this.sigAR||4));
+          const gh   = ghost.offsetHeight || Math.round((cw*(this.widthPct/100))/(this.sigAR||4));
           const x_pct = (left / cw) * 100.0;
           const y_from_bottom = (ch - (top + gh));
           const y_pct = (y_from_bottom / ch) * 100.0;
@@ -526,13 +765,13 @@ HTML = r"""
           this.layoutGhost();
         },
         resetSign(){
-          this.placements=[]; this.typedText=''; this.widthPct=35; this.clearPad(); this.layoutGhost();
+          this.placements=[]; this.anchorText=''; this.typedText=''; this.widthPct=35; this.clearPad(); this.layoutGhost();
         },
 
         // ===== Submit =====
         beforeSubmit(e){
           if(!this.pdfDoc){ e.preventDefault(); alert('Pilih PDF terlebih dulu.'); return; }
-          if(this.placements.length===0){ e.preventDefault(); alert('Belum ada placement. Klik "Apply ke halaman ini".'); return; }
+          if(this.placements.length===0 && !this.anchorText.trim()){ e.preventDefault(); alert('Belum ada placement. Klik "Apply ke halaman ini".'); return; }
           this.$refs.placements.value = JSON.stringify(this.placements);
           if(this.mode==='draw' && this.$refs.pad){
             this.$refs.drawndata.value = this.$refs.pad.toDataURL('image/png');
@@ -619,9 +858,355 @@ def render_typed_signature(text: str, color=(17, 24, 39, 255)) -> BytesIO | None
     bio.seek(0)
     return bio
 
+# ---------- Text anchor index ----------
+CM_TO_PT = 72.0 / 2.54
+TEXT_INDEX_VERSION = 3  # naikkan kalau format fragmen di indeks berubah
+_STANDARD_FONTS = {
+    "Courier", "Courier-Bold", "Courier-Oblique", "Courier-BoldOblique",
+    "Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique",
+    "Times-Roman", "Times-Bold", "Times-Italic", "Times-BoldItalic",
+    "Symbol", "ZapfDingbats",
+}
+_text_index_mem = OrderedDict()
+_text_index_lock = threading.Lock()
+
+class AnchorNotFoundError(ValueError):
+    # placement anchor yang tidak cocok dengan teks mana pun di dokumen
+    def __init__(self, anchor: str):
+        super().__init__(f"Anchor teks tidak ditemukan: {anchor!r}")
+        self.anchor = anchor
+
+def _unicode_to_code_map(font) -> dict:
+    # balikan CMap /ToUnicode: teks unicode -> kode glyph (int)
+    out = {}
+    try:
+        data = font["/ToUnicode"].get_object().get_data().decode("latin-1")
+    except Exception:
+        return out
+
+    def uni(hexstr):
+        raw = bytes.fromhex(hexstr)
+        return raw.decode("utf-16-be", errors="ignore")
+
+    for block in re.findall(r"beginbfchar(.*?)endbfchar", data, re.S):
+        for src, dst in re.findall(r"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]*)>", block):
+            out.setdefault(uni(dst), int(src, 16))
+    for block in re.findall(r"beginbfrange(.*?)endbfrange", data, re.S):
+        for lo, hi, rest in re.findall(r"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>\s*(\[[^\]]*\]|<[0-9A-Fa-f]*>)", block):
+            lo, hi = int(lo, 16), int(hi, 16)
+            if rest.startswith("["):
+                for k, dst in enumerate(re.findall(r"<([0-9A-Fa-f]*)>", rest)):
+                    out.setdefault(uni(dst), lo + k)
+            else:
+                base = rest[1:-1]
+                start = int(base, 16) if base else 0
+                width = len(base)
+                for k in range(hi - lo + 1):
+                    out.setdefault(uni(f"{start + k:0{width}X}"), lo + k)
+    return out
+
+def font_advance_fn(font_dict):
+    # fungsi teks -> lebar (satuan 1/1000 em) dari metrik font dokumen;
+    # None kalau metrik tidak bisa dibaca (pemanggil memakai fallback)
+    try:
+        font = font_dict.get_object() if font_dict is not None else None
+        if not font:
+            return None
+        base = str(font.get("/BaseFont", "")).lstrip("/").split("+")[-1]
+        widths, default = {}, None
+        if font.get("/Subtype") == "/Type0":
+            desc = font["/DescendantFonts"][0].get_object()
+            default = float(desc.get("/DW", 1000))
+            w = [x.get_object() for x in desc.get("/W", [])]
+            i = 0
+            while i + 1 < len(w):
+                first = int(w[i])
+                if isinstance(w[i + 1], list):
+                    for k, v in enumerate(w[i + 1]):
+                        widths[first + k] = float(v)
+                    i += 2
+                else:
+                    last, v = int(w[i + 1]), float(w[i + 2])
+                    for c in range(first, last + 1):
+                        widths[c] = v
+                    i += 3
+            simple = False
+        else:
+            first = int(font.get("/FirstChar", 0))
+            for k, v in enumerate(font.get("/Widths", [])):
+                widths[first + k] = float(v)
+            if not widths:
+                if base in _STANDARD_FONTS:
+                    return lambda text: stringWidth(text, base, 1000)
+                return None
+            fd = font.get("/FontDescriptor")
+            default = float(fd.get_object().get("/MissingWidth", 0)) if fd else 0.0
+            simple = True
+        if not default:
+            default = sum(widths.values()) / len(widths) if widths else 500.0
+        codes = _unicode_to_code_map(font)
+    except Exception:
+        return None
+
+    def advance(text: str) -> float:
+        total = 0.0
+        for ch in text:
+            code = codes.get(ch)
+            if code is None and simple:
+                try:
+                    code = ch.encode("cp1252")[0]
+                except Exception:
+                    code = None
+            total += widths.get(code, default)
+        return total
+
+    return advance
+
+def pdf_doc_hash(pdf_in) -> str:
+    h = hashlib.sha256()
+    if isinstance(pdf_in, (str, os.PathLike)):
+        with open(pdf_in, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    elif hasattr(pdf_in, "getbuffer"):
+        h.update(pdf_in.getbuffer())
+    else:
+        pos = pdf_in.tell()
+        pdf_in.seek(0)
+        for chunk in iter(lambda: pdf_in.read(1 << 20), b""):
+            h.update(chunk)
+        pdf_in.seek(pos)
+    return h.hexdigest()
+
+def build_text_index(reader: PdfReader) -> list:
+    # per halaman: [lebar, tinggi, [[x, y, ukuran_font, teks, [x_akhir per karakter]], ...]]
+    # x/y dalam point, relatif ke pojok kiri-bawah mediabox (y = baseline);
+    # x_akhir tiap karakter diukur dari lebar glyph font dokumen saat indeks dibangun
+    pages = []
+    fonts = {}
+    for page in reader.pages:
+        box = page.mediabox
+        left, bottom = float(box.left), float(box.bottom)
+        frags = []
+
+        def visit(text, cm, tm, font_dict, font_size):
+            text = (text or "").strip("\r\n")
+            if not text.strip():
+                return
+            x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+            y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+            scale = math.hypot(tm[0] * cm[0] + tm[1] * cm[2], tm[0] * cm[1] + tm[1] * cm[3]) or 1.0
+            size = float(font_size or 0) * scale or 10.0
+            key = id(font_dict)
+            if key not in fonts:
+                fonts[key] = (font_dict, font_advance_fn(font_dict))  # simpan ref agar id tidak dipakai ulang
+            advance = fonts[key][1]
+            ends, pos = [], x - left
+            for ch in text:
+                pos += advance(ch) / 1000.0 * size if advance else stringWidth(ch, "Helvetica", size)
+                ends.append(round(pos, 1))
+            frags.append([round(x - left, 1), round(y - bottom, 1), round(size, 1), text, ends])
+
+        try:
+            page.extract_text(visitor_text=visit)
+        except Exception:
+            pass
+        pages.append([round(float(box.width), 1), round(float(box.height), 1), frags])
+    return pages
+
+def get_text_index(reader: PdfReader, key: str) -> list:
+    # urutan lookup: memori (LRU) -> file .json.gz di INDEX_DIR -> bangun ulang
+    with _text_index_lock:
+        index = _text_index_mem.get(key)
+        if index is not None:
+            _text_index_mem.move_to_end(key)
+            return index
+    path = os.path.join(INDEX_DIR, key[:2], f"{key}.v{TEXT_INDEX_VERSION}.json.gz")
+    index = None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            index = json.load(f)
+    except Exception:
+        index = None
+    if index is None:
+        maybe_cleanup_text_index()
+        index = build_text_index(reader)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                json.dump(index, f, separators=(",", ":"), ensure_ascii=False)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except Exception:
+                pass
+    with _text_index_lock:
+        _text_index_mem[key] = index
+        _text_index_mem.move_to_end(key)
+        while len(_text_index_mem) > TEXT_INDEX_MEM_MAX:
+            _text_index_mem.popitem(last=False)
+    return index
+
+def _norm_anchor(text: str) -> str:
+    return "".join(text.split()).lower()
+
+def find_text_anchor(index: list, anchor: str, pages=None) -> list:
+    # hasil: [(page 0-based, x_akhir_anchor, y_baseline, ukuran_font)] dalam point
+    needle = _norm_anchor(anchor)
+    if not needle:
+        return []
+    hits = []
+    for pno, (_, _, frags) in enumerate(index):
+        if pages is not None and pno not in pages:
+            continue
+        # gabungkan fragmen yang satu baris, lalu cocokkan tanpa spasi & case
+        lines = {}
+        for frag in frags:
+            lines.setdefault(round(frag[1]), []).append(frag)
+        for parts in lines.values():
+            parts.sort(key=lambda it: it[0])
+            chars, where = [], []
+            for pi, (_, _, _, text, _) in enumerate(parts):
+                for ci, ch in enumerate(text):
+                    if not ch.isspace():
+                        chars.append(ch.lower())
+                        where.append((pi, ci))
+            joined = "".join(chars)
+            start = joined.find(needle)
+            while start >= 0:
+                pi, ci = where[start + len(needle) - 1]
+                _, y, size, _, ends = parts[pi]
+                hits.append((pno, ends[ci], y, size))
+                start = joined.find(needle, start + len(needle))
+    return hits
+
+def expand_anchor_placements(reader: PdfReader, pdf_in, placements: list) -> list:
+    # placement anchor: {anchor, dx_cm, dy_cm, width_pct, pages?, occurrence?}
+    # -> diubah jadi placement biasa {page, x_pct, y_pct, width_pct}
+    # AnchorNotFoundError kalau sebuah anchor tidak cocok di halaman mana pun
+    if not any(isinstance(p, dict) and p.get("anchor") for p in placements or []):
+        return placements
+    index = get_text_index(reader, pdf_doc_hash(pdf_in))
+    out = []
+    for p in placements:
+        if not isinstance(p, dict) or not p.get("anchor"):
+            out.append(p)
+            continue
+        try:
+            dx = float(p.get("dx_cm", 0.0)) * CM_TO_PT
+            dy = float(p.get("dy_cm", 0.0)) * CM_TO_PT
+            width_pct = float(p.get("width_pct", 35.0))
+        except Exception:
+            raise ValueError(f"Placement anchor tidak valid: {p!r}")
+        spec = str(p.get("pages") or "all")
+        pages = set(parse_ranges(spec, len(index)))
+        hits = find_text_anchor(index, str(p["anchor"]), pages)
+        if not hits:
+            raise AnchorNotFoundError(str(p["anchor"]))
+        if str(p.get("occurrence", "all")).lower() == "first":
+            hits = hits[:1]
+        for pno, x_end, y, _ in hits:
+            page_w, page_h = index[pno][0], index[pno][1]
+            out.append({
+                "page": pno + 1,
+                "x_pct": (x_end + dx) / page_w * 100.0,
+                "y_pct": (y + dy) / page_h * 100.0,
+                "width_pct": width_pct,
+            })
+    return out
+
+# ---------- Core operations (path file atau stream) ----------
+_MERGE_ITEM_RE = re.compile(r"^(.*?)\s*\[([^\]]*)\]$")
+
+class MergeInputError(ValueError):
+    # input merge yang rusak/tidak valid; .name = nama file yang bermasalah
+    def __init__(self, name: str, cause: Exception):
+        super().__init__(f"{name}: {cause}")
+        self.name = name
+
+def split_merge_item(item: str, local_files: bool = False) -> tuple:
+    # "a.pdf[1-3]" -> ("a.pdf", "1-3"); "a.pdf" -> ("a.pdf", "all")
+    # local_files=True (khusus CLI): file yang namanya memang berakhiran "[..]" tidak dipecah
+    item = item.strip()
+    m = _MERGE_ITEM_RE.match(item)
+    if m and not (local_files and os.path.exists(item)):
+        return m.group(1), m.group(2).strip() or "all"
+    return item, "all"
+
+def parse_merge_spec(spec: str) -> list:
+    # "a.pdf[1-3] + b.pdf[all]" (boleh juga dipisah baris baru) -> [(nama, rentang)]
+    items = []
+    for part in re.split(r"\s*\+\s*|\n", spec or ""):
+        if part.strip():
+            items.append(split_merge_item(part))
+    return items
+
+def _checked_merge_pages(reader: PdfReader, ranges: str) -> list:
+    # validasi: halaman terpilih tidak kosong & content stream-nya bisa di-decode
+    pages = parse_ranges(ranges or "all", len(reader.pages))
+    if not pages:
+        raise ValueError(f"rentang halaman '{ranges}' kosong")
+    for i in pages:
+        page = reader.pages[i]
+        contents = page.get_contents()
+        if contents is None:
+            if "/Contents" in page:  # referensi ke objek yang hilang/rusak
+                raise ValueError(f"konten halaman {i + 1} rusak")
+            continue
+        contents.get_data()
+    return pages
+
+def merge_pdfs(sources: list, out, check_contents: bool = False) -> None:
+    # sources: src | (src, rentang) | (src, rentang, nama); src = path atau stream.
+    # Input rusak pertama menghentikan merge (MergeInputError) sebelum hasil ditulis.
+    # check_contents=True: content stream tiap halaman terpilih juga di-decode
+    # (lebih lambat, untuk input yang tidak dipercaya).
+    # Sengaja serial: objek pypdf tidak bisa dipindah antar process, dan merakit
+    # hasil parse dari worker sama mahalnya dengan parse ulang di sini.
+    merger = PdfWriter()
+    for n, s in enumerate(sources):
+        src, ranges, name = (tuple(s) + (None, None))[:3] if isinstance(s, (tuple, list)) else (s, None, None)
+        if name is None:
+            name = src if isinstance(src, (str, os.PathLike)) else f"input #{n + 1}"
+        try:
+            reader = PdfReader(src)
+            if check_contents:
+                pages = _checked_merge_pages(reader, ranges)
+            else:
+                pages = parse_ranges(ranges or "all", len(reader.pages))
+            for i in pages:
+                merger.add_page(reader.pages[i])
+        except Exception as e:
+            raise MergeInputError(str(name), e) from e
+    merger.write(out)
+    merger.close()
+
+def split_pdf(src, ranges: str, out) -> None:
+    reader = PdfReader(src)
+    pages = parse_ranges(ranges, len(reader.pages))
+    writer = PdfWriter()
+    for i in pages:
+        writer.add_page(reader.pages[i])
+    writer.write(out)
+    writer.close()
+
+def rotate_pdf(src, ranges: str, deg: int, out) -> None:
+    reader = PdfReader(src)
+    total = len(reader.pages)
+    target_idx = set(parse_ranges(ranges, total))
+    writer = PdfWriter()
+    for idx, page in enumerate(reader.pages):
+        if idx in target_idx or ranges.lower() == "all":
+            page.rotate(deg)
+        writer.add_page(page)
+    writer.write(out)
+    writer.close()
+
 def add_signature_to_pdf_points(
     pdf_in: BytesIO,
-    placements: list,  # [{page:1-based, x_pct,y_pct,width_pct}]
+    placements: list,  # [{page:1-based, x_pct,y_pct,width_pct}] atau [{anchor, dx_cm, dy_cm, width_pct}]
     sig_mode: str,
     sig_image_file,
     drawn_data_url: str,
@@ -629,13 +1214,31 @@ def add_signature_to_pdf_points(
     with_date: bool,
     date_fmt: str,
 ) -> bytes:
+    out = BytesIO()
+    sign_pdf(pdf_in, out, placements, sig_mode, sig_image_file, drawn_data_url, typed_text, with_date, date_fmt)
+    return out.getvalue()
+
+def sign_pdf(
+    pdf_in,
+    out,
+    placements: list,
+    sig_mode: str,
+    sig_image_file=None,  # FileStorage (web) atau path gambar (CLI)
+    drawn_data_url: str = "",
+    typed_text: str = "",
+    with_date: bool = False,
+    date_fmt: str = "%d %b %Y",
+) -> None:
     reader = PdfReader(pdf_in)
     total = len(reader.pages)
+    placements = expand_anchor_placements(reader, pdf_in, placements)
 
     # siapkan gambar tanda tangan
     sig_img_bio = None
     if sig_mode == "draw":
         sig_img_bio = decode_data_url_png(drawn_data_url)
+    elif sig_mode == "upload" and isinstance(sig_image_file, (str, os.PathLike)):
+        sig_img_bio = sig_image_file
     elif sig_mode == "upload" and sig_image_file and getattr(sig_image_file, "filename", ""):
         sig_img_bio = BytesIO(sig_image_file.read())
     elif sig_mode == "typed":
@@ -659,6 +1262,8 @@ def add_signature_to_pdf_points(
                 })
         except Exception:
             continue
+    if not norm:
+        raise ValueError("Tidak ada placement yang valid; dokumen tidak ditandatangani.")
 
     writer = PdfWriter()
     for i, page in enumerate(reader.pages):
@@ -691,10 +1296,77 @@ def add_signature_to_pdf_points(
             page.merge_page(overlay_reader.pages[0])
         writer.add_page(page)
 
-    out = BytesIO()
     writer.write(out)
     writer.close()
-    return out.getvalue()
+
+# ---------- Profiling (opt-in: CIBEN_PROFILE=1) ----------
+app.config["PROFILE_ACTIONS"] = os.environ.get("CIBEN_PROFILE") == "1"
+ACTION_PROFILE = {}  # action -> {count, ms_total, peak_kb_max, peak_kb_total, rss_kb_max}
+_profile_lock = threading.Lock()
+_profile_run_lock = threading.Lock()
+
+def _rss_kb() -> int | None:
+    # RSS saat ini (KB): /proc di Linux, psutil (opsional) di platform lain
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except Exception:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss // 1024
+    except Exception:
+        return None
+
+@contextmanager
+def profile_action(action: str | None):
+    # peak tracemalloc global per process, jadi aksi yang diprofil dijalankan
+    # satu per satu (lock) dan tracing hanya aktif selama aksi itu berjalan;
+    # alokasi thread lain di luar aksi (parsing upload, render template) tetap ikut
+    # terhitung kalau server menerima request paralel
+    if not app.config.get("PROFILE_ACTIONS") or not action:
+        yield
+        return
+    with _profile_run_lock:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            _, peak = tracemalloc.get_traced_memory()
+            if started:
+                tracemalloc.stop()
+            _record_action_profile(action, ms, max(0, peak - base) / 1024, _rss_kb())
+
+def _record_action_profile(action: str, ms: float, peak_kb: float, rss: int | None) -> None:
+    with _profile_lock:
+        st = ACTION_PROFILE.setdefault(action, {
+            "count": 0, "ms_total": 0.0, "peak_kb_max": 0.0, "peak_kb_total": 0.0, "rss_kb_max": 0,
+        })
+        st["count"] += 1
+        st["ms_total"] += ms
+        st["peak_kb_total"] += peak_kb
+        st["peak_kb_max"] = max(st["peak_kb_max"], peak_kb)
+        if rss is not None:
+            st["rss_kb_max"] = max(st["rss_kb_max"], rss)
+
+def action_profile_report() -> dict:
+    with _profile_lock:
+        return {
+            action: {
+                "count": st["count"],
+                "ms_avg": round(st["ms_total"] / st["count"], 1),
+                "peak_kb_avg": round(st["peak_kb_total"] / st["count"], 1),
+                "peak_kb_max": round(st["peak_kb_max"], 1),
+                "rss_kb_max": st["rss_kb_max"],
+            }
+            for action, st in ACTION_PROFILE.items()
+        }
 
 # ---------- Routes ----------
 @app.route("/", methods=["GET", "POST"])
@@ -702,97 +1374,545 @@ def index():
     result_url = None
     filename = None
     size_kb = None
+    error = None
     active_tab = "sign"
 
     if request.method == "POST":
         action = request.form.get("action")
 
-        if action == "merge":
-            active_tab = "merge"
-            files = request.files.getlist("files")
-            merger = PdfWriter()
-            for f in files:
-                if not f or not f.filename:
-                    continue
-                reader = PdfReader(BytesIO(f.read()))
-                for page in reader.pages:
-                    merger.add_page(page)
-            out = BytesIO()
-            merger.write(out)
-            merger.close()
-            result_url, filename, size_kb = save_result_pdf(out.getvalue(), "merged.pdf")
-
-        elif action == "split":
-            active_tab = "split"
-            f = request.files.get("file")
-            ranges = request.form.get("ranges", "")
-            if f and f.filename:
-                reader = PdfReader(BytesIO(f.read()))
-                pages = parse_ranges(ranges, len(reader.pages))
-                writer = PdfWriter()
-                for i in pages:
-                    writer.add_page(reader.pages[i])
-                out = BytesIO()
-                writer.write(out)
-                writer.close()
-                result_url, filename, size_kb = save_result_pdf(out.getvalue(), "extracted.pdf")
-
-        elif action == "rotate":
-            active_tab = "rotate"
-            f = request.files.get("file")
-            ranges = request.form.get("ranges", "all")
-            deg = int(request.form.get("deg", "90"))
-            if f and f.filename:
-                reader = PdfReader(BytesIO(f.read()))
-                total = len(reader.pages)
-                target_idx = parse_ranges(ranges, total)
-                writer = PdfWriter()
-                for idx, page in enumerate(reader.pages):
-                    if idx in target_idx or ranges.lower() == "all":
-                        page.rotate(deg)
-                    writer.add_page(page)
-                out = BytesIO()
-                writer.write(out)
-                writer.close()
-                result_url, filename, size_kb = save_result_pdf(out.getvalue(), "rotated.pdf")
-
-        elif action == "sign-dnd":
-            active_tab = "sign"
-            pdf_file = request.files.get("file")
-            if pdf_file and pdf_file.filename:
+        with profile_action(action):
+            if action == "merge":
+                active_tab = "merge"
+                files = request.files.getlist("files")
+                uploads = [(f.filename, f.read()) for f in files if f and f.filename]
+                spec = parse_merge_spec(request.form.get("merge_spec", ""))
                 try:
-                    placements = json.loads(request.form.get("placements", "[]"))
-                except Exception:
-                    placements = []
-                sig_mode = request.form.get("sig_mode", "draw")
-                sig_image_file = request.files.get("sig_image")
-                drawn_data = request.form.get("drawn_data", "")
-                typed_text = request.form.get("typed_text", "")
-                with_date = request.form.get("with_date") == "on"
-                date_fmt = request.form.get("date_fmt", "%d %b %Y")
-
-                pdf_bytes = pdf_file.read()
-                final_bytes = add_signature_to_pdf_points(
-                    pdf_in=BytesIO(pdf_bytes),
-                    placements=placements,
-                    sig_mode=sig_mode,
-                    sig_image_file=sig_image_file,
-                    drawn_data_url=drawn_data,
-                    typed_text=typed_text,
-                    with_date=with_date,
-                    date_fmt=date_fmt,
-                )
-                result_url, filename, size_kb = save_result_pdf(final_bytes, "signed.pdf")
+                    if spec:
+                        by_name = {}
+                        for name, data in uploads:
+                            if name in by_name:
+                                raise ValueError(f"Nama file ganda: {name}; ganti nama salah satunya agar urutan jelas.")
+                            by_name[name] = data
+                        missing = [name for name, _ in spec if name not in by_name]
+                        if missing:
+                            raise ValueError("File tidak diunggah: " + ", ".join(missing))
+                        sources = [(BytesIO(by_name[name]), ranges, name) for name, ranges in spec]
+                    else:
+                        sources = [(BytesIO(data), "all", name) for name, data in uploads]
+                    out = BytesIO()
+                    merge_pdfs(sources, out)
+                    result_url, filename, size_kb = save_result_pdf(out.getvalue(), "merged.pdf")
+                except MergeInputError as e:
+                    error = f"Gagal membaca {e.name}: {e.__cause__ or e}"
+                except ValueError as e:
+                    error = str(e)
+
+            elif action == "split":
+                active_tab = "split"
+                f = request.files.get("file")
+                ranges = request.form.get("ranges", "")
+                if f and f.filename:
+                    out = BytesIO()
+                    split_pdf(BytesIO(f.read()), ranges, out)
+                    result_url, filename, size_kb = save_result_pdf(out.getvalue(), "extracted.pdf")
+
+            elif action == "rotate":
+                active_tab = "rotate"
+                f = request.files.get("file")
+                ranges = request.form.get("ranges", "all")
+                deg = int(request.form.get("deg", "90"))
+                if f and f.filename:
+                    out = BytesIO()
+                    rotate_pdf(BytesIO(f.read()), ranges, deg, out)
+                    result_url, filename, size_kb = save_result_pdf(out.getvalue(), "rotated.pdf")
+
+            elif action == "sign-dnd":
+                active_tab = "sign"
+                pdf_file = request.files.get("file")
+                if pdf_file and pdf_file.filename:
+                    try:
+                        placements = json.loads(request.form.get("placements", "[]"))
+                    except Exception:
+                        placements = []
+                    if not isinstance(placements, list):
+                        placements = []
+                    anchor_text = request.form.get("anchor_text", "").strip()
+                    if anchor_text:
+                        try:
+                            anchor_dx = float(request.form.get("anchor_dx_cm", "2") or 0)
+                        except ValueError:
+                            anchor_dx = 2.0
+                        try:
+                            anchor_w = float(request.form.get("width_pct", "35") or 35)
+                        except ValueError:
+                            anchor_w = 35.0
+                        placements.append({
+                            "anchor": anchor_text,
+                            "dx_cm": anchor_dx,
+                            "dy_cm": 0.0,
+                            "width_pct": anchor_w,
+                            "pages": request.form.get("anchor_pages", "all") or "all",
+                        })
+                    sig_mode = request.form.get("sig_mode", "draw")
+                    sig_image_file = request.files.get("sig_image")
+                    drawn_data = request.form.get("drawn_data", "")
+                    typed_text = request.form.get("typed_text", "")
+                    with_date = request.form.get("with_date") == "on"
+                    date_fmt = request.form.get("date_fmt", "%d %b %Y")
+
+                    pdf_bytes = pdf_file.read()
+                    try:
+                        final_bytes = add_signature_to_pdf_points(
+                            pdf_in=BytesIO(pdf_bytes),
+                            placements=placements,
+                            sig_mode=sig_mode,
+                            sig_image_file=sig_image_file,
+                            drawn_data_url=drawn_data,
+                            typed_text=typed_text,
+                            with_date=with_date,
+                            date_fmt=date_fmt,
+                        )
+                        result_url, filename, size_kb = save_result_pdf(final_bytes, "signed.pdf")
+                    except ValueError as e:
+                        error = str(e)
 
     return render_template_string(
         HTML,
         result_url=result_url,
         filename=filename,
         size_kb=size_kb,
+        error=error,
         active_tab=active_tab
     )
 
+@app.route("/_profile.json")
+def serve_action_profile():
+    if not app.config.get("PROFILE_ACTIONS"):
+        return "Not found", 404
+    return action_profile_report()
+
+# ---------- Load test ----------
+LOADTEST_ACTIONS = ("merge", "split", "rotate", "sign")
+
+def _synthetic_pdf(pages: int) -> bytes:
+    bio = BytesIO()
+    can = rlcanvas.Canvas(bio, pagesize=(595, 842))
+    for i in range(pages):
+        can.setFont("Helvetica", 12)
+        for line in range(40):
+            can.drawString(56, 780 - line * 16, f"Halaman {i + 1} baris {line + 1} — lorem ipsum dolor sit amet")
+        can.drawString(56, 90, "Tanda tangan:")
+        can.showPage()
+    can.save()
+    return bio.getvalue()
+
+def _loadtest_payload(action: str, pdf: bytes) -> tuple:
+    # (form fields, [(field, filename, bytes)])
+    if action == "merge":
+        return {"action": "merge"}, [("files", f"in{i}.pdf", pdf) for i in range(3)]
+    if action == "split":
+        return {"action": "split", "ranges": "1-2,last"}, [("file", "in.pdf", pdf)]
+    if action == "rotate":
+        return {"action": "rotate", "ranges": "all", "deg": "90"}, [("file", "in.pdf", pdf)]
+    placements = [{"page": 1, "x_pct": 60.0, "y_pct": 10.0, "width_pct": 30}]
+    return {
+        "action": "sign-dnd",
+        "placements": json.dumps(placements),
+        "sig_mode": "typed",
+        "typed_text": "Load Test",
+        "with_date": "on",
+    }, [("file", "in.pdf", pdf)]
+
+def _multipart(fields: dict, files: list) -> tuple:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for k, v in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n'.encode())
+    for k, name, data in files:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{k}"; filename="{name}"\r\n'
+            f'Content-Type: application/pdf\r\n\r\n'.encode() + data + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+def _percentile(sorted_ms: list, q: float) -> float | None:
+    if not sorted_ms:
+        return None
+    k = max(0, min(len(sorted_ms) - 1, math.ceil(q / 100 * len(sorted_ms)) - 1))
+    return round(sorted_ms[k], 1)
+
+def _latency_stats(ms: list, seconds: float) -> dict:
+    ms = sorted(ms)
+    return {
+        "count": len(ms),
+        "rps": round(len(ms) / seconds, 2) if seconds else None,
+        "p50_ms": _percentile(ms, 50),
+        "p95_ms": _percentile(ms, 95),
+        "p99_ms": _percentile(ms, 99),
+        "max_ms": round(ms[-1], 1) if ms else None,
+    }
+
+_RESULT_LINK_RE = re.compile(r'href="/result/[0-9a-f]{32}\.pdf"')
+
+def _loadtest_ok(status, body: str) -> bool:
+    # 200 saja tidak cukup: index() juga merender error card dengan status 200
+    return status == 200 and "Gagal diproses" not in body and bool(_RESULT_LINK_RE.search(body))
+
+def run_loadtest(
+    total: int = 200,
+    concurrency: int = 8,
+    mix: dict | None = None,
+    pages: int = 5,
+    url: str | None = None,
+    profile: bool = False,
+    seed: int = 0,
+    profile_runs: int = 3,
+) -> dict:
+    # url=None -> Flask test client di process ini; url -> server yang sudah jalan.
+    # Latency diukur tanpa profiling; dengan profile=True menyusul pass terpisah
+    # (berurutan, concurrency 1, profile_runs request per aksi) untuk peak memori.
+    # Nama aksi di laporan = nilai field "action" di index() (mis. "sign-dnd").
+    # Request dihitung sukses hanya jika halaman berisi link /result/<token>.pdf.
+    # Dengan test client, hasil ditulis ke storage sementara lalu dibuang.
+    import random
+    import shutil
+    import urllib.request
+    from concurrent.futures import ThreadPoolExecutor
+
+    mix = mix or {a: 1 for a in LOADTEST_ACTIONS}
+    pool = [a for a, w in mix.items() for _ in range(max(0, int(w)))]
+    if not pool:
+        raise ValueError("mix kosong")
+    rnd = random.Random(seed)
+    schedule = [rnd.choice(pool) for _ in range(total)]
+    pdf = _synthetic_pdf(pages)
+    payloads = {a: _loadtest_payload(a, pdf) for a in set(schedule)}
+
+    local = threading.local()
+
+    def one(action: str) -> tuple:
+        fields, files = payloads[action]
+        t0 = time.perf_counter()
+        try:
+            if url:
+                body, ctype = _multipart(fields, files)
+                req = urllib.request.Request(url, data=body, headers={"Content-Type": ctype}, method="POST")
+                with urllib.request.urlopen(req) as resp:
+                    ok = _loadtest_ok(resp.status, resp.read().decode("utf-8", "replace"))
+            else:
+                client = getattr(local, "client", None)
+                if client is None:
+                    client = local.client = app.test_client()
+                data = dict(fields)
+                for k, name, raw in files:
+                    data.setdefault(k, []).append((BytesIO(raw), name))
+                resp = client.post("/", data=data, content_type="multipart/form-data")
+                ok = _loadtest_ok(resp.status_code, resp.get_data(as_text=True))
+        except Exception:
+            ok = False
+        return fields["action"], ok, (time.perf_counter() - t0) * 1000
+
+    global _result_storage
+    prev_profile = app.config.get("PROFILE_ACTIONS")
+    prev_storage = _result_storage
+    tmp_root = None
+    if not url:
+        app.config["PROFILE_ACTIONS"] = False
+        tmp_root = tempfile.mkdtemp(prefix="ciben-loadtest-")
+        with _result_storage_lock:
+            _result_storage = LocalShardedStorage(tmp_root)
+    try:
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as ex:
+            results = list(ex.map(one, schedule))
+        seconds = time.perf_counter() - t0
+
+        if profile and not url:
+            ACTION_PROFILE.clear()
+            app.config["PROFILE_ACTIONS"] = True
+            for action in sorted(payloads):
+                for _ in range(max(1, profile_runs)):
+                    one(action)
+    finally:
+        app.config["PROFILE_ACTIONS"] = prev_profile
+        if tmp_root:
+            with _result_storage_lock:
+                _result_storage = prev_storage
+            shutil.rmtree(tmp_root, ignore_errors=True)
+
+    ok = [r for r in results if r[1]]
+    report = {
+        "target": url or "test_client",
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": total - len(ok),
+        "seconds": round(seconds, 3),
+        "overall": _latency_stats([r[2] for r in ok], seconds),
+        "actions": {
+            a: _latency_stats([r[2] for r in ok if r[0] == a], seconds)
+            for a in sorted({r[0] for r in results})
+        },
+    }
+    if profile and not url:
+        report["profile"] = {
+            "mode": f"pass terpisah: berurutan, {max(1, profile_runs)} request per aksi",
+            "actions": action_profile_report(),
+        }
+    elif profile:
+        # server dijalankan dengan CIBEN_PROFILE=1: aksi diprofil satu per satu di
+        # server, jadi latency di atas ikut memuat antrean profiling tersebut
+        try:
+            from urllib.parse import urljoin
+            with urllib.request.urlopen(urljoin(url, "/_profile.json")) as resp:
+                actions = json.loads(resp.read())
+        except Exception:
+            actions = None
+        report["profile"] = {
+            "mode": "server-side (CIBEN_PROFILE=1); latency termasuk serialisasi profiling",
+            "actions": actions,
+        }
+    return report
+
+# ---------- CLI / batch ----------
+def _expand_pdf_inputs(paths: list) -> list:
+    # file langsung, atau direktori -> semua *.pdf di dalamnya (urut nama)
+    out = []
+    for p in paths:
+        if os.path.isdir(p):
+            for name in sorted(os.listdir(p)):
+                if name.lower().endswith(".pdf"):
+                    out.append(os.path.join(p, name))
+        else:
+            out.append(p)
+    return out
+
+def _output_path(src: str, output: str, suffix: str, single: bool) -> str:
+    if single and output.lower().endswith(".pdf"):
+        return output
+    stem = os.path.splitext(os.path.basename(src))[0]
+    return os.path.join(output, f"{stem}-{suffix}.pdf")
+
+def _run_job(job: tuple) -> dict:
+    # dijalankan di worker process: harus top-level agar bisa di-pickle
+    op, src, dst, opts = job
+    t0 = time.perf_counter()
+    try:
+        if op == "split":
+            split_pdf(src, opts["ranges"], dst)
+        elif op == "rotate":
+            rotate_pdf(src, opts["ranges"], opts["deg"], dst)
+        elif op == "sign":
+            sign_pdf(src, dst, **opts)
+        else:
+            raise ValueError(f"Operasi tidak dikenal: {op}")
+        ok, err = True, None
+    except Exception as e:
+        ok, err = False, f"{type(e).__name__}: {e}"
+    return {
+        "event": "file",
+        "op": op,
+        "input": src,
+        "output": dst,
+        "ok": ok,
+        "error": err,
+        "ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+
+def _emit(rec: dict) -> None:
+    print(json.dumps(rec, ensure_ascii=False), flush=True)
+
+def run_batch(jobs: list, workers: int = 1) -> int:
+    # laporan progres per file sebagai JSON lines; return jumlah yang gagal
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    t0 = time.perf_counter()
+    failed = 0
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_job, job) for job in jobs]
+            for done, fut in enumerate(as_completed(futures), 1):
+                rec = fut.result()
+                failed += not rec["ok"]
+                _emit({**rec, "done": done, "total": len(jobs)})
+    else:
+        for done, job in enumerate(jobs, 1):
+            rec = _run_job(job)
+            failed += not rec["ok"]
+            _emit({**rec, "done": done, "total": len(jobs)})
+    _emit({
+        "event": "summary",
+        "total": len(jobs),
+        "ok": len(jobs) - failed,
+        "failed": failed,
+        "seconds": round(time.perf_counter() - t0, 3),
+    })
+    return failed
+
+def _load_placements(value: str) -> list:
+    if not value:
+        return []
+    if value.startswith("@"):
+        with open(value[1:], "r", encoding="utf-8") as f:
+            return json.load(f)
+    return json.loads(value)
+
+def main(argv=None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(prog="cibenpdf", description="PDF Tools Mini — server web atau CLI batch.")
+    sub = ap.add_subparsers(dest="cmd")
+
+    sp = sub.add_parser("serve", help="jalankan server web (default)")
+    sp.add_argument("--host", default="0.0.0.0")
+    sp.add_argument("--port", type=int, default=5002)
+    sp.add_argument("--no-debug", action="store_true")
+
+    sp = sub.add_parser("merge", help="gabungkan PDF (urutan sesuai argumen)")
+    sp.add_argument("inputs", nargs="+", help="file PDF / direktori, opsional dengan rentang: a.pdf[1-3] + b.pdf[all]")
+    sp.add_argument("-o", "--output", required=True, help="file PDF hasil")
+    sp.add_argument("--check", action="store_true", help="decode konten tiap halaman (lebih lambat)")
+
+    for name, hlp in (("split", "ekstrak halaman"), ("rotate", "putar halaman"), ("sign", "tempel tanda tangan")):
+        sp = sub.add_parser(name, help=hlp)
+        sp.add_argument("inputs", nargs="+", help="file PDF atau direktori")
+        sp.add_argument("-o", "--output", required=True, help="direktori hasil (atau file .pdf untuk satu input)")
+        sp.add_argument("-j", "--jobs", type=int, default=1, help="jumlah worker process")
+        if name in ("split", "rotate"):
+            sp.add_argument("-r", "--ranges", default="all", help="contoh: 1,3-5,8 / all / last")
+        if name == "rotate":
+            sp.add_argument("-d", "--deg", type=int, default=90, choices=(90, 180, 270))
+        if name == "sign":
+            sp.add_argument("--placements", default="", help="JSON placements, atau @file.json")
+            sp.add_argument("--anchor", default="", help="teks anchor, mis. 'Tanda tangan:'")
+            sp.add_argument("--dx-cm", type=float, default=2.0)
+            sp.add_argument("--dy-cm", type=float, default=0.0)
+            sp.add_argument("--anchor-pages", default="all")
+            sp.add_argument("--width-pct", type=float, default=35.0)
+            sp.add_argument("--sig-image", default="", help="gambar tanda tangan (PNG)")
+            sp.add_argument("--typed", default="", help="nama untuk tanda tangan ketik")
+            sp.add_argument("--with-date", action="store_true")
+            sp.add_argument("--date-fmt", default="%d %b %Y")
+
+    sp = sub.add_parser("loadtest", help="uji beban merge/split/rotate/sign ke app ini")
+    sp.add_argument("-n", "--requests", type=int, default=200)
+    sp.add_argument("-c", "--concurrency", type=int, default=8)
+    sp.add_argument("--mix", default="merge=1,split=1,rotate=1,sign=1", help="bobot aksi, mis. sign=3,merge=1")
+    sp.add_argument("--pages", type=int, default=5, help="jumlah halaman PDF sintetis")
+    sp.add_argument("--url", default="", help="URL server (default: Flask test client in-process)")
+    sp.add_argument("--profile", action="store_true", help="pass terpisah: peak tracemalloc/RSS per aksi")
+    sp.add_argument("--profile-runs", type=int, default=3, help="request per aksi di pass profiling")
+    sp.add_argument("--seed", type=int, default=0)
+
+    args = ap.parse_args(argv)
+
+    if args.cmd in (None, "serve"):
+        host = getattr(args, "host", "0.0.0.0")
+        port = getattr(args, "port", 5002)
+        app.run(debug=not getattr(args, "no_debug", False), host=host, port=port)
+        return 0
+
+    if args.cmd == "loadtest":
+        mix = {}
+        for part in args.mix.split(","):
+            name, _, weight = part.partition("=")
+            if name.strip() not in LOADTEST_ACTIONS:
+                ap.error(f"aksi tidak dikenal di --mix: {name.strip()}")
+            try:
+                mix[name.strip()] = int(weight or 1)
+            except ValueError:
+                ap.error(f"bobot tidak valid di --mix: {part}")
+        report = run_loadtest(
+            total=args.requests,
+            concurrency=max(1, args.concurrency),
+            mix=mix,
+            pages=max(1, args.pages),
+            url=args.url or None,
+            profile=args.profile,
+            profile_runs=args.profile_runs,
+            seed=args.seed,
+        )
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return 1 if report["errors"] else 0
+
+    if args.cmd == "merge":
+        items = []
+        for arg in args.inputs:
+            if arg.strip() == "+":
+                continue
+            path, ranges = split_merge_item(arg, local_files=True)
+            items.extend((p, ranges) for p in _expand_pdf_inputs([path]))
+        if not items:
+            ap.error("tidak ada file PDF pada input")
+        t0 = time.perf_counter()
+        try:
+            merge_pdfs(items, args.output, check_contents=args.check)
+        except MergeInputError as e:
+            _emit({"event": "error", "op": "merge", "input": e.name, "error": str(e)})
+            return 1
+        _emit({
+            "event": "summary",
+            "op": "merge",
+            "inputs": len(items),
+            "output": args.output,
+            "seconds": round(time.perf_counter() - t0, 3),
+        })
+        return 0
+
+    inputs = _expand_pdf_inputs(args.inputs)
+    if not inputs:
+        ap.error("tidak ada file PDF pada input")
+
+    single = len(inputs) == 1
+    if not single and args.output.lower().endswith(".pdf"):
+        ap.error("banyak input butuh direktori hasil, bukan file .pdf")
+
+    if args.cmd == "split":
+        opts, suffix = {"ranges": args.ranges}, "extracted"
+    elif args.cmd == "rotate":
+        opts, suffix = {"ranges": args.ranges, "deg": args.deg}, "rotated"
+    else:
+        placements = _load_placements(args.placements)
+        if not isinstance(placements, list):
+            ap.error("--placements harus berupa JSON list")
+        if args.anchor:
+            placements.append({
+                "anchor": args.anchor,
+                "dx_cm": args.dx_cm,
+                "dy_cm": args.dy_cm,
+                "width_pct": args.width_pct,
+                "pages": args.anchor_pages,
+            })
+        if not placements:
+            ap.error("butuh --placements atau --anchor")
+        if not (args.sig_image or args.typed):
+            ap.error("butuh --sig-image atau --typed")
+        opts = {
+            "placements": placements,
+            "sig_mode": "upload" if args.sig_image else "typed",
+            "sig_image_file": args.sig_image or None,
+            "typed_text": args.typed,
+            "with_date": args.with_date,
+            "date_fmt": args.date_fmt,
+        }
+        suffix = "signed"
+
+    # dua input dengan nama file sama (mis. d1/x.pdf & d2/x.pdf) akan saling menimpa
+    targets = {}
+    for src in inputs:
+        dst = os.path.normcase(os.path.abspath(_output_path(src, args.output, suffix, single)))
+        targets.setdefault(dst, []).append(src)
+    clashes = [srcs for srcs in targets.values() if len(srcs) > 1]
+    if clashes:
+        ap.error("nama hasil bentrok: " + "; ".join(" & ".join(srcs) for srcs in clashes))
+    if not (single and args.output.lower().endswith(".pdf")):
+        os.makedirs(args.output, exist_ok=True)
+
+    jobs = [(args.cmd, src, _output_path(src, args.output, suffix, single), opts) for src in inputs]
+    return 1 if run_batch(jobs, max(1, args.jobs)) else 0
+
 if __name__ == "__main__":
     # pip install flask pypdf reportlab pillow
-    # python pdf_tools.py  ->  http://localhost:5002/
-    app.run(debug=True, host="0.0.0.0", port=5002)
+    # python cibenpdf.py  ->  http://localhost:5002/
+    # python cibenpdf.py sign ./in -o ./out --anchor "Tanda tangan:" --sig-image ttd.png -j 4
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+import pytest
+
+for mod in ("flask", "pypdf", "reportlab", "PIL"):
+    pytest.importorskip(mod)
+
+from pypdf import PdfReader  # noqa: E402
+from pypdf.generic import (  # noqa: E402
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+)
+from reportlab.pdfbase import pdfmetrics  # noqa: E402
+from reportlab.pdfbase.pdfmetrics import stringWidth  # noqa: E402
+from reportlab.pdfbase.ttfonts import TTFont  # noqa: E402
+from reportlab.pdfgen import canvas  # noqa: E402
+
+import cibenpdf  # noqa: E402
+from cibenpdf import (  # noqa: E402
+    CM_TO_PT,
+    AnchorNotFoundError,
+    build_text_index,
+    expand_anchor_placements,
+    find_text_anchor,
+)
+
+ANCHOR = "Tanda tangan:"
+
+
+def make_pdf(path, lines_per_page, font="Times-Roman", size=14):
+    # lines_per_page: [[(x, y, teks), ...] per halaman]
+    c = canvas.Canvas(str(path), pagesize=(595, 842))
+    for lines in lines_per_page:
+        c.setFont(font, size)
+        for x, y, text in lines:
+            c.drawString(x, y, text)
+        c.showPage()
+    c.save()
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def isolated_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(cibenpdf, "INDEX_DIR", str(tmp_path / "index"))
+    cibenpdf._text_index_mem.clear()
+
+
+def test_anchor_as_own_fragment_uses_document_font(tmp_path):
+    path = make_pdf(tmp_path / "own.pdf", [[(100, 200, ANCHOR), (400, 200, "Nama")]])
+    hits = find_text_anchor(build_text_index(PdfReader(path)), ANCHOR)
+    assert len(hits) == 1
+    pno, x_end, y, _ = hits[0]
+    assert pno == 0 and y == pytest.approx(200, abs=0.2)
+    # Times jauh lebih sempit dari Helvetica; posisi harus pakai metrik Times
+    assert x_end == pytest.approx(100 + stringWidth(ANCHOR, "Times-Roman", 14), abs=0.2)
+
+
+def test_anchor_ending_mid_fragment(tmp_path):
+    pdfmetrics.registerFont(TTFont("Vera", "Vera.ttf"))
+    path = make_pdf(tmp_path / "mid.pdf", [[(80, 300, ANCHOR + " ______ Budi")]], font="Vera", size=12)
+    hits = find_text_anchor(build_text_index(PdfReader(path)), "tanda  TANGAN:")
+    assert len(hits) == 1
+    assert hits[0][1] == pytest.approx(80 + stringWidth(ANCHOR, "Vera", 12), abs=0.2)
+
+
+def test_expand_places_signature_right_of_anchor(tmp_path):
+    path = make_pdf(tmp_path / "place.pdf", [[(100, 200, ANCHOR)]])
+    out = expand_anchor_placements(PdfReader(path), path, [{"anchor": ANCHOR, "dx_cm": 2, "width_pct": 30}])
+    x_end = 100 + stringWidth(ANCHOR, "Times-Roman", 14)
+    assert out == [{
+        "page": 1,
+        "x_pct": pytest.approx((x_end + 2 * CM_TO_PT) / 595 * 100, abs=0.05),
+        "y_pct": pytest.approx(200 / 842 * 100, abs=0.05),
+        "width_pct": 30.0,
+    }]
+
+
+def test_unmatched_anchor_raises(tmp_path):
+    path = make_pdf(tmp_path / "none.pdf", [[(100, 200, "Tidak ada apa-apa")]])
+    with pytest.raises(AnchorNotFoundError):
+        expand_anchor_placements(PdfReader(path), path, [{"anchor": ANCHOR}])
+
+
+def test_page_range_filter(tmp_path):
+    path = make_pdf(tmp_path / "pages.pdf", [[(100, 200, ANCHOR)], [(100, 250, ANCHOR)], [(100, 300, "x")]])
+    index = build_text_index(PdfReader(path))
+    assert [h[0] for h in find_text_anchor(index, ANCHOR)] == [0, 1]
+    out = expand_anchor_placements(PdfReader(path), path, [{"anchor": ANCHOR, "pages": "2"}])
+    assert [p["page"] for p in out] == [2]
+    with pytest.raises(AnchorNotFoundError):
+        expand_anchor_placements(PdfReader(path), path, [{"anchor": ANCHOR, "pages": "3"}])
+
+
+def test_tounicode_cmap_and_cid_widths():
+    cmap = DecodedStreamObject()
+    cmap.set_data(
+        b"2 beginbfchar <0003> <0020> <0041> <0054> endbfchar\n"
+        b"1 beginbfrange <0042> <0044> <0061> endbfrange\n"
+        b"1 beginbfrange <0050> <0051> [<006E> <003A>] endbfrange\n"
+    )
+    desc = DictionaryObject({
+        NameObject("/DW"): NumberObject(1000),
+        NameObject("/W"): ArrayObject([
+            NumberObject(0x41), ArrayObject([NumberObject(600)]),
+            NumberObject(0x42), NumberObject(0x44), NumberObject(400),
+        ]),
+    })
+    font = DictionaryObject({
+        NameObject("/Subtype"): NameObject("/Type0"),
+        NameObject("/ToUnicode"): cmap,
+        NameObject("/DescendantFonts"): ArrayObject([desc]),
+    })
+    assert cibenpdf._unicode_to_code_map(font) == {" ": 3, "T": 0x41, "a": 0x42, "b": 0x43, "c": 0x44, "n": 0x50, ":": 0x51}
+    advance = cibenpdf.font_advance_fn(font)
+    assert advance("Ta") == 1000  # 600 + 400 dari /W
+    assert advance("n") == 1000  # tidak ada di /W -> /DW
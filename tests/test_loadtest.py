@@ -0,0 +1,30 @@
+import pytest
+
+for mod in ("flask", "pypdf", "reportlab", "PIL"):
+    pytest.importorskip(mod)
+
+import cibenpdf  # noqa: E402
+
+
+class RecordingStorage(cibenpdf.LocalShardedStorage):
+    def save(self, token, data):
+        raise AssertionError("load test menulis ke storage hasil asli")
+
+
+def test_loadtest_uses_temporary_storage(monkeypatch, tmp_path):
+    real = RecordingStorage(str(tmp_path))
+    monkeypatch.setattr(cibenpdf, "_result_storage", real)
+    report = cibenpdf.run_loadtest(total=8, concurrency=2, pages=3)
+    assert report["errors"] == 0
+    assert sum(a["count"] for a in report["actions"].values()) == 8
+    assert cibenpdf._result_storage is real
+
+
+def test_loadtest_counts_error_page_as_error(monkeypatch, tmp_path):
+    monkeypatch.setattr(cibenpdf, "_result_storage", cibenpdf.LocalShardedStorage(str(tmp_path)))
+    fields, files = cibenpdf._loadtest_payload("sign", cibenpdf._synthetic_pdf(1))
+    # placements kosong -> index() merender "Gagal diproses" dengan status 200
+    monkeypatch.setattr(cibenpdf, "_loadtest_payload", lambda a, pdf: (dict(fields, placements="[]"), files))
+    report = cibenpdf.run_loadtest(total=3, concurrency=1, mix={"sign": 1}, pages=1)
+    assert report["errors"] == 3
+    assert report["actions"]["sign-dnd"]["count"] == 0
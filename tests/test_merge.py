@@ -0,0 +1,102 @@
+import re
+from io import BytesIO
+
+import pytest
+
+for mod in ("flask", "pypdf", "reportlab", "PIL"):
+    pytest.importorskip(mod)
+
+from pypdf import PdfReader  # noqa: E402
+
+import cibenpdf  # noqa: E402
+from cibenpdf import MergeInputError, merge_pdfs, parse_merge_spec, split_merge_item  # noqa: E402
+
+
+def pdf_bytes(pages=3):
+    return cibenpdf._synthetic_pdf(pages)
+
+
+def broken_contents(pages=2):
+    # referensi /Contents ke objek yang tidak ada: struktur file masih terbaca
+    return re.sub(rb"/Contents \d+ 0 R", b"/Contents 999 0 R", pdf_bytes(pages), count=1)
+
+
+@pytest.mark.parametrize("item,expected", [
+    ("a.pdf[1-3]", ("a.pdf", "1-3")),
+    (" a.pdf [ 2, last ] ", ("a.pdf", "2, last")),
+    ("a.pdf[]", ("a.pdf", "all")),
+    ("a.pdf", ("a.pdf", "all")),
+    ("scan [2024].pdf", ("scan [2024].pdf", "all")),
+    ("scan [2024].pdf[1]", ("scan [2024].pdf", "1")),
+])
+def test_split_merge_item(item, expected):
+    assert split_merge_item(item) == expected
+
+
+def test_split_merge_item_keeps_existing_bracketed_file(tmp_path):
+    path = tmp_path / "laporan[final]"
+    path.write_bytes(b"")
+    assert split_merge_item(str(path), local_files=True) == (str(path), "all")
+    assert split_merge_item(str(path)) == (str(tmp_path / "laporan"), "final")
+
+
+def test_parse_merge_spec_splits_on_plus_and_newline():
+    spec = "a.pdf[1-3] + b.pdf[all]\nc.pdf\n\n  +d.pdf[last]"
+    assert parse_merge_spec(spec) == [
+        ("a.pdf", "1-3"), ("b.pdf", "all"), ("c.pdf", "all"), ("d.pdf", "last"),
+    ]
+    assert parse_merge_spec("") == []
+    assert parse_merge_spec(None) == []
+
+
+def test_merge_follows_spec_order_and_ranges():
+    out = BytesIO()
+    merge_pdfs([(BytesIO(pdf_bytes(3)), "2-3", "a.pdf"), (BytesIO(pdf_bytes(2)), "1", "b.pdf")], out)
+    assert len(PdfReader(BytesIO(out.getvalue())).pages) == 3
+
+
+def test_merge_stops_at_first_bad_file():
+    out = BytesIO()
+    with pytest.raises(MergeInputError) as exc:
+        merge_pdfs([
+            (BytesIO(pdf_bytes()), "all", "ok.pdf"),
+            (BytesIO(b"bukan pdf"), "all", "rusak.pdf"),
+            (BytesIO(b"juga bukan"), "all", "rusak2.pdf"),
+        ], out)
+    assert exc.value.name == "rusak.pdf"
+    assert out.getvalue() == b""
+
+
+def test_check_contents_is_opt_in():
+    merge_pdfs([(BytesIO(broken_contents()), "all", "x.pdf")], BytesIO())
+    with pytest.raises(MergeInputError) as exc:
+        merge_pdfs([(BytesIO(broken_contents()), "all", "x.pdf")], BytesIO(), check_contents=True)
+    assert exc.value.name == "x.pdf" and "konten halaman 1 rusak" in str(exc.value)
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(cibenpdf, "_result_storage", cibenpdf.LocalShardedStorage(str(tmp_path)))
+    return cibenpdf.app.test_client()
+
+
+def post_merge(client, files, spec=""):
+    data = {"action": "merge", "merge_spec": spec, "files": [(BytesIO(raw), name) for name, raw in files]}
+    return client.post("/", data=data, content_type="multipart/form-data").get_data(as_text=True)
+
+
+def test_web_merge_rejects_duplicate_upload_names(client):
+    body = post_merge(client, [("a.pdf", pdf_bytes()), ("a.pdf", pdf_bytes())], spec="a.pdf[1]")
+    assert "Gagal diproses" in body and "Nama file ganda: a.pdf" in body
+
+
+def test_web_merge_reports_missing_and_bad_files(client):
+    body = post_merge(client, [("a.pdf", pdf_bytes())], spec="a.pdf + b.pdf")
+    assert "File tidak diunggah: b.pdf" in body
+    body = post_merge(client, [("a.pdf", pdf_bytes()), ("b.pdf", b"bukan pdf")], spec="a.pdf + b.pdf")
+    assert "Gagal membaca b.pdf" in body and "/result/" not in body
+
+
+def test_web_merge_with_spec(client):
+    body = post_merge(client, [("a.pdf", pdf_bytes(3)), ("b.pdf", pdf_bytes(2))], spec="b.pdf[2] + a.pdf[1-2]")
+    assert "Berhasil diproses" in body and re.search(r'href="/result/[0-9a-f]{32}\.pdf"', body)
@@ -0,0 +1,96 @@
+import os
+import threading
+import uuid
+from io import BytesIO
+
+import pytest
+
+for mod in ("flask", "pypdf", "reportlab", "PIL"):
+    pytest.importorskip(mod)
+
+import cibenpdf  # noqa: E402
+from cibenpdf import LocalShardedStorage, ResultStorage, S3Storage  # noqa: E402
+
+
+class InMemoryS3Client:
+    # stand-in S3 minimal (put_object / get_object); error key-tidak-ada meniru
+    # bentuk ClientError botocore (.response["Error"]["Code"])
+    class NoSuchKey(Exception):
+        def __init__(self, key):
+            super().__init__(f"NoSuchKey: {key}")
+            self.response = {"Error": {"Code": "NoSuchKey", "Message": key}}
+
+    def __init__(self):
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        with self._lock:
+            self.objects[(Bucket, Key)] = bytes(Body)
+        return {}
+
+    def get_object(self, Bucket, Key):
+        with self._lock:
+            data = self.objects.get((Bucket, Key))
+        if data is None:
+            raise self.NoSuchKey(Key)
+        return {"Body": BytesIO(data), "ContentLength": len(data)}
+
+
+def test_result_storage_is_abstract():
+    with pytest.raises(TypeError):
+        ResultStorage()
+
+
+def test_s3_storage_roundtrip_with_in_memory_client():
+    client = InMemoryS3Client()
+    st = S3Storage("bucket", prefix="results/", client=client)
+    token = uuid.uuid4().hex
+    st.save(token, b"%PDF-1.4 test")
+    assert ("bucket", f"results/{token[:2]}/{token}.pdf") in client.objects
+    assert st.open(token).read() == b"%PDF-1.4 test"
+
+
+def test_s3_storage_missing_key_is_none():
+    st = S3Storage("bucket", client=InMemoryS3Client())
+    assert st.open(uuid.uuid4().hex) is None
+
+
+def test_s3_storage_propagates_other_errors():
+    class Broken(InMemoryS3Client):
+        def get_object(self, Bucket, Key):
+            raise ConnectionError("endpoint unreachable")
+
+    st = S3Storage("bucket", client=Broken())
+    with pytest.raises(ConnectionError):
+        st.open(uuid.uuid4().hex)
+
+
+def test_local_sharded_storage_layout_and_legacy_fallback(tmp_path):
+    st = LocalShardedStorage(str(tmp_path))
+    token = uuid.uuid4().hex
+    st.save(token, b"data")
+    assert st.open(token) == os.path.join(str(tmp_path), token[:2], f"{token}.pdf")
+
+    legacy = uuid.uuid4().hex
+    (tmp_path / f"{legacy}.pdf").write_bytes(b"old")
+    assert st.open(legacy) == os.path.join(str(tmp_path), f"{legacy}.pdf")
+    assert st.open(uuid.uuid4().hex) is None
+
+
+def test_storage_is_created_lazily(monkeypatch, tmp_path):
+    # konfigurasi S3 yang tidak lengkap baru gagal saat storage benar-benar dipakai
+    monkeypatch.setenv("CIBEN_STORAGE", "s3")
+    monkeypatch.delenv("CIBEN_S3_BUCKET", raising=False)
+    monkeypatch.setattr(cibenpdf, "_result_storage", None)
+    src = tmp_path / "in.pdf"
+    cibenpdf.merge_pdfs([], str(src))
+    cibenpdf.rotate_pdf(str(src), "all", 90, BytesIO())
+    with pytest.raises(RuntimeError):
+        cibenpdf.get_result_storage()
+
+    monkeypatch.setenv("CIBEN_STORAGE", "local")
+    monkeypatch.setattr(cibenpdf, "RESULT_DIR", str(tmp_path / "results"))
+    st = cibenpdf.get_result_storage()
+    assert isinstance(st, LocalShardedStorage)
+    assert cibenpdf.get_result_storage() is st